@@ -1,21 +1,158 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd 
 import numpy as np
 import matplotlib.pyplot as plt
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+SHOT_TYPES = ('2-pt 0-5 ft', '2-pt 6-10 ft', '2-pt 11-15 ft', '2-pt >15 ft',
+              '3-pt <26 ft', '3-pt 26-30 ft', '3-pt >30 ft')
+POINT_VALUES = np.array([2, 2, 2, 2, 3, 3, 3])
+EDGES_2PT = np.array([5, 10, 15], dtype=np.float32)
+EDGES_3PT = np.array([25, 30], dtype=np.float32)
+SEASON_FILES = ('NBA-PBP-2019-2020.csv', 'NBA-PBP-2018-2019.csv',
+                'NBA-PBP-2017-2018.csv', 'NBA-PBP-2016-2017.csv')
+PBP_COLUMNS = ['Shooter', 'ShotType', 'ShotOutcome', 'ShotDist', 'Rebounder', 'ReboundType',
+               'SecLeft', 'AwayPlay', 'AwayScore', 'HomeScore', 'TurnoverType',
+               'FreeThrowNum', 'FreeThrowOutcome']
+PBP_DTYPES = {'ShotDist': 'float32', 'ShotType': 'category', 'ShotOutcome': 'category',
+              'ReboundType': 'category', 'FreeThrowNum': 'category',
+              'FreeThrowOutcome': 'category', 'SecLeft': 'int16', 'AwayScore': 'int16',
+              'HomeScore': 'int16'}
+# bump whenever PBP_COLUMNS, PBP_DTYPES or the columns load_season adds change
+CACHE_VERSION = 2
+CACHE_KEY = b'pbp_cache_key'
+
+
+def season_key(path):
+    """
+    Takes as param the path to a season's NBA play by play csv.
+
+    Returns a list of CACHE_VERSION and the csv's modification time
+    and size, or None if the csv isn't present.
+    """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [CACHE_VERSION, stat.st_mtime_ns, stat.st_size]
+
+
+def read_season_cache(cache_path, key):
+    """
+    Takes as param the path to a season's parquet cache and the
+    season's key from season_key.
+
+    Returns the cached data if it was written under the same key, or
+    under the current CACHE_VERSION when the csv isn't present.
+    Otherwise, including when the cache can't be read, returns None.
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        metadata = pyarrow.parquet.read_schema(cache_path).metadata or {}
+        cached_key = json.loads(metadata.get(CACHE_KEY, b'null'))
+        if cached_key is None or cached_key[0] != CACHE_VERSION:
+            return None
+        if key is not None and cached_key != key:
+            return None
+        return pd.read_parquet(cache_path, engine='pyarrow')
+    except (pyarrow.ArrowException, OSError, ValueError):
+        return None
+
+
+def write_season_cache(cache_path, key, data):
+    """
+    Takes as param the path to a season's parquet cache, the season's
+    key from season_key and the season's play by play data.
+
+    Saves the data as zstd compressed parquet with the key stored in
+    the file's schema metadata. The file is written to a temporary
+    path and moved into place, so an interrupted run never leaves a
+    truncated cache behind.
+    """
+    table = pyarrow.Table.from_pandas(data)
+    metadata = dict(table.schema.metadata or {})
+    metadata[CACHE_KEY] = json.dumps(key).encode()
+    tmp_path = cache_path + '.tmp'
+    pyarrow.parquet.write_table(table.replace_schema_metadata(metadata), tmp_path,
+                                compression='zstd')
+    os.replace(tmp_path, cache_path)
+
+
+def load_season(path):
+    """
+    Takes as param the path to a season's NBA play by play csv.
+
+    Reads only the columns used by the analysis, with low cardinality
+    text columns stored as categoricals. Also adds an is_3pt column
+    flagging 3-pt shots so later steps don't need string matching.
+    Uses the multithreaded pyarrow parser when pyarrow is installed
+    and pandas' C parser otherwise. With pyarrow, the parsed data is
+    also cached as parquet next to the csv, and later runs read the
+    cache instead of parsing the csv again until the csv or
+    CACHE_VERSION changes.
+
+    Returns the season's play by play data.
+    """
+    if pyarrow is None:
+        data = pd.read_csv(path, usecols=PBP_COLUMNS, dtype=PBP_DTYPES, engine='c', low_memory=False)
+    else:
+        cache_path = os.path.splitext(path)[0] + '.parquet'
+        key = season_key(path)
+        data = read_season_cache(cache_path, key)
+        if data is not None:
+            return data
+        data = pd.read_csv(path, usecols=PBP_COLUMNS, dtype=PBP_DTYPES, engine='pyarrow')
+    three_pt_codes = np.flatnonzero(data['ShotType'].cat.categories.str.startswith('3-pt'))
+    data['is_3pt'] = np.isin(data['ShotType'].cat.codes.to_numpy(), three_pt_codes)
+    if pyarrow is not None:
+        write_season_cache(cache_path, key, data)
+    return data
+
 
 def clean_data(data):
     """
     Takes as param NBA play by play data to be cleaned.
 
-    Condenses full game data down to data that matters (mostly shots and rebounds).
+    Condenses full game data down to data that matters (shots and rebounds).
+    Other plays are dropped so a missed shot is directly followed by
+    its rebound.
 
     Returns the cleaned data.
     """
-    filtered = data[['Shooter', 'ShotType', 'ShotOutcome', 'ShotDist', 'Rebounder', 'ReboundType', 'SecLeft']]
-    filtered = filtered.dropna(thresh=2)
+    shot_or_reb = np.logical_or.reduce([data['Shooter'].notna().to_numpy(),
+                                        data['ShotType'].cat.codes.to_numpy() != -1,
+                                        data['ShotOutcome'].cat.codes.to_numpy() != -1,
+                                        data['ShotDist'].notna().to_numpy(),
+                                        data['Rebounder'].notna().to_numpy(),
+                                        data['ReboundType'].cat.codes.to_numpy() != -1])
+    filtered = data.loc[shot_or_reb, ['Shooter', 'ShotType', 'ShotOutcome', 'ShotDist', 'Rebounder', 'ReboundType', 'SecLeft', 'is_3pt']]
     return filtered    
 
 
+def category_mask(column, value):
+    """
+    Takes as param a categorical column and a value to match.
+
+    Compares the column's integer category codes against the code
+    for value rather than comparing the strings themselves.
+
+    Returns a bool np array marking the rows equal to value.
+    """
+    code = column.cat.categories.get_indexer([value])[0]
+    if code == -1:
+        return np.zeros(len(column), dtype=bool)
+    return column.cat.codes.to_numpy() == code
+
+
 def calc_ppp(data):
     """
     Takes as param NBA play by play data.
@@ -29,333 +166,260 @@ def calc_ppp(data):
 
     Returns the calculated ppp.
     """
-    pts = 0
-    pts_data = data[data['AwayPlay'] == 'End of Game']
-    pts = pts_data['AwayScore'].sum()
-    pts += pts_data['HomeScore'].sum()
-    shot = ~pd.isnull(data['Shooter'])
-    turnover = ~pd.isnull(data['TurnoverType'])
-    ft_1_of_2 = data['FreeThrowNum'] == '1 of 2'
-    ft_1_of_3 = data['FreeThrowNum'] == '1 of 3'
-    ft_2_of_3 = data['FreeThrowNum'] == '2 of 3'
-    ft_miss = data['FreeThrowOutcome'] == 'miss'
-    poss_data = data[shot | turnover | ft_1_of_2 | ft_1_of_3]
-    orb = data['ReboundType'] == 'offensive'
-    not_end_of_q = data['SecLeft'] != 0
-    orbs_data = data[orb & not_end_of_q]
-    ft_orbs_data = data[ft_miss & (ft_1_of_2 | ft_1_of_3 | ft_2_of_3)]
-    total_orbs = len(orbs_data) - len(ft_orbs_data)
-    total_poss = len(poss_data) - total_orbs
+    end_of_game = (data['AwayPlay'] == 'End of Game').to_numpy()
+    pts = data['AwayScore'].to_numpy()[end_of_game].sum(dtype=np.int64)
+    pts += data['HomeScore'].to_numpy()[end_of_game].sum(dtype=np.int64)
+    shot = data['Shooter'].notna().to_numpy()
+    turnover = data['TurnoverType'].notna().to_numpy()
+    ft_1_of_2 = category_mask(data['FreeThrowNum'], '1 of 2')
+    ft_1_of_3 = category_mask(data['FreeThrowNum'], '1 of 3')
+    ft_2_of_3 = category_mask(data['FreeThrowNum'], '2 of 3')
+    ft_miss = category_mask(data['FreeThrowOutcome'], 'miss')
+    orb = category_mask(data['ReboundType'], 'offensive')
+    not_end_of_q = data['SecLeft'].to_numpy() != 0
+    # combine the masks in place so each expression reuses one buffer. Only
+    # arrays allocated here are written to: the notna() arrays can be
+    # read-only views under pandas copy-on-write
+    ft_trip = np.logical_or(ft_1_of_2, ft_1_of_3, out=ft_1_of_2)
+    poss_mask = shot | turnover
+    poss = np.count_nonzero(np.logical_or(poss_mask, ft_trip, out=poss_mask))
+    orbs = np.count_nonzero(np.logical_and(orb, not_end_of_q, out=orb))
+    ft_not_last = np.logical_or(ft_trip, ft_2_of_3, out=ft_2_of_3)
+    ft_orbs = np.count_nonzero(np.logical_and(ft_miss, ft_not_last, out=ft_miss))
+    total_orbs = orbs - ft_orbs
+    total_poss = poss - total_orbs
     ppp = pts / total_poss
     return ppp
 
 
-def calc_shots(data):
+def shot_buckets(data):
+    """
+    Takes as param a season's cleaned NBA play by play data.
+
+    Assigns each shot the index of its type in SHOT_TYPES, by
+    point-value and then distance. Rows without a shot distance are
+    assigned len(SHOT_TYPES). That covers non-shot rows and also shots
+    with a missing ShotDist, so those shots count toward neither
+    attempts nor offensive rebounds.
+
+    Returns a np array holding each row's shot type index.
+    """
+    shot_dist = data['ShotDist'].to_numpy()
+    # side='left' keeps a shot exactly on an edge in the shorter bucket
+    buckets = np.where(data['is_3pt'].to_numpy(),
+                       4 + np.searchsorted(EDGES_3PT, shot_dist, side='left'),
+                       np.searchsorted(EDGES_2PT, shot_dist, side='left'))
+    buckets[np.isnan(shot_dist)] = len(SHOT_TYPES)
+    return buckets
+
+
+def count_shot_types(buckets):
     """
-    Takes as param a list of different years' NBA play by play data.
+    Takes as param a np array of shot type indices from shot_buckets.
+
+    Returns a np array holding the number of shots of each type in SHOT_TYPES.
+    """
+    return np.bincount(buckets, minlength=len(SHOT_TYPES) + 1)[:len(SHOT_TYPES)]
+
+
+def calc_shots(data, buckets):
+    """
+    Takes as param a season's cleaned NBA play by play data.
+    Takes as param the season's shot type indices from shot_buckets.
 
     Calculates the number of attempts and makes for several different types
     of shots by distance and point-value.
 
-    Returns a list of dicts mapping each type of shot to a np array
-    whose 0th index contains attempts and 1st index contains makes.
-    """
-    shot_data = []
-    for year in data:
-        shots = {}
-        shots['2-pt 0-5 ft'] = np.zeros(2, dtype=int)
-        shots['2-pt 6-10 ft'] = np.zeros(2, dtype=int)
-        shots['2-pt 11-15 ft'] = np.zeros(2, dtype=int)
-        shots['2-pt >15 ft'] = np.zeros(2, dtype=int)
-        shots['3-pt <26 ft'] = np.zeros(2, dtype=int)
-        shots['3-pt 26-30 ft'] = np.zeros(2, dtype=int)
-        shots['3-pt >30 ft'] = np.zeros(2, dtype=int)
-        two_pt_zero_to_five_ft = year[year['ShotDist'] <= 5]
-        shots['2-pt 0-5 ft'][0] = len(two_pt_zero_to_five_ft)
-        shots['2-pt 0-5 ft'][1] = len(two_pt_zero_to_five_ft[two_pt_zero_to_five_ft['ShotOutcome'] == 'make'])
-        two_pt_six_to_ten_ft = year[(year['ShotDist'] > 5) & (year['ShotDist'] <= 10)]
-        shots['2-pt 6-10 ft'][0] = len(two_pt_six_to_ten_ft)
-        shots['2-pt 6-10 ft'][1] = len(two_pt_six_to_ten_ft[two_pt_six_to_ten_ft['ShotOutcome'] == 'make'])
-        two_pt_eleven_to_fifteen_ft = year[(year['ShotDist'] > 10) & (year['ShotDist'] <= 15)]
-        shots['2-pt 11-15 ft'][0] = len(two_pt_eleven_to_fifteen_ft)
-        shots['2-pt 11-15 ft'][1] = len(two_pt_eleven_to_fifteen_ft[two_pt_eleven_to_fifteen_ft['ShotOutcome'] == 'make'])
-        two_pt_fifteen_plus_ft = year[(year['ShotType'].str.contains('2-pt')) & (year['ShotDist'] > 15)]
-        shots['2-pt >15 ft'][0] = len(two_pt_fifteen_plus_ft)
-        shots['2-pt >15 ft'][1] = len(two_pt_fifteen_plus_ft[two_pt_fifteen_plus_ft['ShotOutcome'] == 'make'])
-        three_pt_twenty_five_or_less_ft = year[(year['ShotType'].str.contains('3-pt')) & (year['ShotDist'] <= 25)]
-        shots['3-pt <26 ft'][0] = len(three_pt_twenty_five_or_less_ft)
-        shots['3-pt <26 ft'][1] = len(three_pt_twenty_five_or_less_ft[three_pt_twenty_five_or_less_ft['ShotOutcome'] == 'make'])
-        three_pt_twenty_six_to_thirty_ft = year[(year['ShotDist'] > 25) & (year['ShotDist'] <= 30)]
-        shots['3-pt 26-30 ft'][0] = len(three_pt_twenty_six_to_thirty_ft)
-        shots['3-pt 26-30 ft'][1] = len(three_pt_twenty_six_to_thirty_ft[three_pt_twenty_six_to_thirty_ft['ShotOutcome'] == 'make'])
-        three_pt_thirty_plus_ft = year[year['ShotDist'] > 30]
-        shots['3-pt >30 ft'][0] = len(three_pt_thirty_plus_ft)
-        shots['3-pt >30 ft'][1] = len(three_pt_thirty_plus_ft[three_pt_thirty_plus_ft['ShotOutcome'] == 'make'])
-        shot_data.append(shots)
-    return shot_data
+    Returns a 2 x 7 np array whose 0th row contains attempts and
+    1st row contains makes for each type of shot in SHOT_TYPES.
+    """
+    made = category_mask(data['ShotOutcome'], 'make')
+    # count (shot type, made) pairs in one pass: row k holds misses, makes
+    counts = np.bincount(2 * buckets + made, minlength=2 * (len(SHOT_TYPES) + 1))
+    counts = counts.reshape(-1, 2)[:len(SHOT_TYPES)]
+    return np.stack([counts.sum(axis=1), counts[:, 1]])
 
     
-def calc_rebs(data):
+def calc_rebs(data, buckets):
     """
-    Takes as param a list of different years' NBA play by play data.
+    Takes as param a season's cleaned NBA play by play data.
+    Takes as param the season's shot type indices from shot_buckets.
 
     Calculates the number of offensive rebounds for each
     type of shot.
 
-    Returns a dict mapping each type of shot to the number
-    of offensive rebounds off of that type of shot
-    """
-    rebs_data = []
-    for year in data:
-        rebs = {}
-        rebs['2-pt 0-5 ft'] = 0
-        rebs['2-pt 6-10 ft'] = 0
-        rebs['2-pt 11-15 ft'] = 0
-        rebs['2-pt >15 ft'] = 0
-        rebs['3-pt <26 ft'] = 0
-        rebs['3-pt 26-30 ft'] = 0 
-        rebs['3-pt >30 ft'] = 0
-        for i in range(len(year)):
-            if year.iloc[i, 2] == 'miss':
-                shot_type = year.iloc[i, 1]
-                shot_dist = year.iloc[i, 3]
-                off_reb = 0
-                if year.iloc[i + 1, 5] == 'offensive' and year.iloc[i + 1, 6] != 0:
-                    off_reb = 1
-                if shot_dist <= 5:
-                    rebs['2-pt 0-5 ft'] += off_reb
-                elif shot_dist <= 10:
-                    rebs['2-pt 6-10 ft'] += off_reb
-                elif shot_dist <= 15:
-                    rebs['2-pt 11-15 ft'] += off_reb
-                elif '2-pt' in shot_type:
-                    rebs['2-pt >15 ft'] += off_reb
-                elif shot_dist <= 25:
-                    rebs['3-pt <26 ft'] += off_reb
-                elif shot_dist <= 30:
-                    rebs['3-pt 26-30 ft'] += off_reb
-                else:
-                    rebs['3-pt >30 ft'] += off_reb
-        rebs_data.append(rebs)
-    return rebs_data
+    Returns a np array holding the number of offensive
+    rebounds off of each type of shot in SHOT_TYPES.
+    """
+    sec_left = data['SecLeft'].to_numpy()
+    miss = category_mask(data['ShotOutcome'], 'miss')
+    orb = category_mask(data['ReboundType'], 'offensive')
+    # a miss is offensive rebounded when the next play is an offensive
+    # rebound that isn't an end of quarter team rebound
+    next_is_orb = np.zeros(len(data), dtype=bool)
+    next_is_orb[:-1] = orb[1:] & (sec_left[1:] != 0)
+    return count_shot_types(buckets[miss & next_is_orb])
+
+
+def process_season(path):
+    """
+    Takes as param the path to a season's NBA play by play csv.
+
+    Loads the season and runs each per-season calculation on it,
+    dropping the full season's data once it has been cleaned.
+    Meant to be run in a worker process, so only the small results
+    are sent back rather than the season's data.
+
+    Returns a tuple of the season's ppp, shot data and rebound data.
+    """
+    data = load_season(path)
+    ppp = calc_ppp(data)
+    cleaned_data = clean_data(data)
+    # only the cleaned rows are needed from here on
+    del data
+    buckets = shot_buckets(cleaned_data)
+    return ppp, calc_shots(cleaned_data, buckets), calc_rebs(cleaned_data, buckets)
 
 
 def calc_exp_pts(shots):
     """
-    Takes as param a list of different years' NBA play by play data.
+    Takes as param a n_seasons x 2 x 7 np array of shot data.
 
     Calculates the expected points generated for
     each type of shot taken without factoring in
     offensive rebounding.
 
-    Returns a list of dicts mapping each type of shot to
-    the expected points.
-    """
-    exp_pts_data = []
-    for year in shots:
-        exp_pts = {}
-        attempts = np.array([year[shot_type][0] for shot_type in year])
-        makes = np.array([year[shot_type][1] for shot_type in year])
-        make_percentages = makes / attempts
-        exp_pts['2-pt 0-5 ft'] = 2 * make_percentages[0]
-        exp_pts['2-pt 6-10 ft'] = 2 * make_percentages[1]
-        exp_pts['2-pt 11-15 ft'] = 2 * make_percentages[2]
-        exp_pts['2-pt >15 ft'] = 2 * make_percentages[3]
-        exp_pts['3-pt <26 ft'] = 3 * make_percentages[4]
-        exp_pts['3-pt 26-30 ft'] = 3 * make_percentages[5]
-        exp_pts['3-pt >30 ft'] = 3 * make_percentages[6]
-        exp_pts_data.append(exp_pts)
-    return exp_pts_data
+    Returns a n_seasons x 7 np array holding each year's expected
+    points for each type of shot in SHOT_TYPES.
+    """
+    return POINT_VALUES * shots[:, 1] / shots[:, 0]
 
 
 def calc_exp_pts_w_orb(shots, rebs, ppp):
     """
-    Takes as param a list of different years' NBA play by play data.
+    Takes as param a n_seasons x 2 x 7 np array of shot data.
+    Takes as param a n_seasons x 7 np array of offensive rebounding data.
+    Takes as param a list of different years' ppp.
 
     Calculates the expected points generated for
     each type of shot taken, factoring in offensive
     rebounding that occurs on missed shots.
 
-    Returns a list of dicts mapping each type of shot to
-    the expected points.
-    """
-    exp_pts_data = []
-    for i in range(len(shots)):
-        exp_pts = {}
-        attempts = np.array([shots[i][shot_type][0] for shot_type in shots[i]])
-        makes = np.array([shots[i][shot_type][1] for shot_type in shots[i]])
-        make_percentages = makes / attempts
-        orbs = np.array([rebs[i][shot_type] for shot_type in rebs[i]])
-        orb_percentages = orbs / attempts
-        exp_pts['2-pt 0-5 ft'] = 2 * make_percentages[0] + orb_percentages[0] * ppp[i]
-        exp_pts['2-pt 6-10 ft'] = 2 * make_percentages[1] + orb_percentages[1] * ppp[i]
-        exp_pts['2-pt 11-15 ft'] = 2 * make_percentages[2] + orb_percentages[2] * ppp[i]
-        exp_pts['2-pt >15 ft'] = 2 * make_percentages[3] + orb_percentages[3] * ppp[i]
-        exp_pts['3-pt <26 ft'] = 3 * make_percentages[4] + orb_percentages[4] * ppp[i]
-        exp_pts['3-pt 26-30 ft'] = 3 * make_percentages[5] + orb_percentages[5] * ppp[i]
-        exp_pts['3-pt >30 ft'] = 3 * make_percentages[6] + orb_percentages[6] * ppp[i]
-        exp_pts_data.append(exp_pts)
-    return exp_pts_data
+    Returns a n_seasons x 7 np array holding each year's expected
+    points for each type of shot in SHOT_TYPES.
+    """
+    ppp = np.asarray(ppp)[:, np.newaxis]
+    return (POINT_VALUES * shots[:, 1] + rebs * ppp) / shots[:, 0]
 
 
-def gen_bar_shots_attempts(shots):
+def plot_bars(ax, values, ylabel, season):
     """
-    Takes as param a list of different years' shot data.
+    Takes as param the axes to draw on, a value for each shot type,
+    the y axis label and the first year of the season.
 
-    Saves a bar chart showing different shot types
-    vs. # of shot attempts.
+    Draws a bar chart of shot types vs. values, 2-pt shots in blue
+    and 3-pt shots in magenta.
+    """
+    ax.bar(SHOT_TYPES, values, color=['b', 'b', 'b', 'b', 'm', 'm', 'm'])
+    ax.set_xticklabels(SHOT_TYPES, rotation=30)
+    ax.set_xlabel('Shot Type')
+    ax.set_ylabel(ylabel)
+    ax.set_title(str(season) + '-' + str(season + 1) + ' League Wide \n Shot Type vs. ' + ylabel)
+
+
+def plot_seasons(values, ylabel, filename):
+    """
+    Takes as param a n_seasons x 7 np array of values, the y axis
+    label and the file to save to.
+
+    Saves a 2 x 2 grid of bar charts, one per season, showing
+    different shot types vs. that season's values.
     """
     fig, ax = plt.subplots(nrows=2, ncols=2, figsize=(10, 10))
     for i in range(len(ax)):
         for j in range(len(ax[0])):
-            shot_types = shots[i * 2 + j].keys()
-            attempts = np.array([shots[i * 2 + j][shot_type][0] for shot_type in shots[i * 2 + j]])
-            ax[i][j].bar(shot_types, attempts, color=['b', 'b', 'b', 'b', 'm', 'm', 'm'])
-            ax[i][j].set_xticklabels(shot_types, rotation=30)
-            ax[i][j].set_xlabel('Shot Type')
-            ax[i][j].set_ylabel('# Shots Attempted')
-            ax[i][j].set_title(str(2019 - i * 2 - j) + '-' + str(2019 - i * 2 - j + 1) + \
-                            ' League Wide \n Shot Type vs. # Shots Attempted')
-            plt.tight_layout()
-    fig.savefig('shot_attempts.png')
+            plot_bars(ax[i][j], values[i * 2 + j], ylabel, 2019 - i * 2 - j)
+    plt.tight_layout()
+    fig.savefig(filename, dpi=96)
+
+
+def gen_bar_shots_attempts(shots):
+    """
+    Takes as param a n_seasons x 2 x 7 np array of shot data.
+
+    Saves a bar chart showing different shot types
+    vs. # of shot attempts.
+    """
+    plot_seasons(shots[:, 0], '# Shots Attempted', 'shot_attempts.png')
 
     
 def gen_bar_shot_percentages(shots):
     """
-    Takes as param a list of different years' shot data.
+    Takes as param a n_seasons x 2 x 7 np array of shot data.
 
     Saves a bar chart showing different shot types
     vs. shot percentages.
     """
-    fig, ax = plt.subplots(nrows=2, ncols=2, figsize=(10, 10))
-    for i in range(len(ax)):
-        for j in range(len(ax[0])):
-            shot_types = shots[i * 2 + j].keys()
-            attempts = np.array([shots[i * 2 + j][shot_type][0] for shot_type in shots[i * 2 + j]])
-            makes = np.array([shots[i * 2 + j][shot_type][1] for shot_type in shots[i * 2 + j]])
-            make_percentages = makes / attempts * 100
-            ax[i][j].bar(shot_types, make_percentages, color=['b', 'b', 'b', 'b', 'm', 'm', 'm'])
-            ax[i][j].set_xticklabels(shot_types, rotation=30)
-            ax[i][j].set_xlabel('Shot Type')
-            ax[i][j].set_ylabel('Field Goal %')
-            ax[i][j].set_title(str(2019 - i * 2 - j) + '-' + str(2019 - i * 2 - j + 1) + \
-                            ' League Wide \n Shot Type vs. Field Goal %')
-            plt.tight_layout()
-    fig.savefig('shot_percentages.png')
+    make_percentages = shots[:, 1] / shots[:, 0] * 100
+    plot_seasons(make_percentages, 'Field Goal %', 'shot_percentages.png')
 
 
 
 def gen_bar_orb_percentages(shots, rebs):
     """
-    Takes as param a list of different years' shot data.
-    Takes as param a list of different years' offensive rebounding data.
+    Takes as param a n_seasons x 2 x 7 np array of shot data.
+    Takes as param a n_seasons x 7 np array of offensive rebounding data.
 
     Saves a bar chart showing different shot types
     vs. the percentage of ATTEMPTS that get offensive rebounded.
     """
-    fig, ax = plt.subplots(nrows=2, ncols=2, figsize=(10, 10))
-    for i in range(len(ax)):
-        for j in range(len(ax[0])):
-            shot_types = shots[i * 2 + j].keys()
-            attempts = np.array([shots[i * 2 + j][shot_type][0] for shot_type in shots[i * 2 + j]])
-            orbs = np.array([rebs[i * 2 + j][shot_type] for shot_type in rebs[i * 2 + j]])
-            orb_percentages = orbs / attempts * 100
-            ax[i][j].bar(shot_types, orb_percentages, color=['b', 'b', 'b', 'b', 'm', 'm', 'm'])
-            ax[i][j].set_xticklabels(shot_types, rotation=30)
-            ax[i][j].set_xlabel('Shot Type')
-            ax[i][j].set_ylabel('Offensive Rebounding %')
-            ax[i][j].set_title(str(2019 - i * 2 - j) + '-' + str(2019 - i * 2 - j + 1) + \
-                            ' League Wide \n Shot Type vs. Offensive Rebounding %')
-            plt.tight_layout()
-    fig.savefig('orb_percentage_of_attempts.png')
+    orb_percentages = rebs / shots[:, 0] * 100
+    plot_seasons(orb_percentages, 'Offensive Rebounding %', 'orb_percentage_of_attempts.png')
 
 
 def gen_bar_orbp_off_miss(shots, rebs):
     """
-    Takes as param a list of different years' shot data.
-    Takes as param a list of different years' offensive rebounding data.
+    Takes as param a n_seasons x 2 x 7 np array of shot data.
+    Takes as param a n_seasons x 7 np array of offensive rebounding data.
 
     Saves a bar chart showing different shot types
     vs. the percentage of MISSES that get offensive rebounded.
     """
-    fig, ax = plt.subplots(nrows=2, ncols=2, figsize=(10, 10))
-    for i in range(len(ax)):
-        for j in range(len(ax[0])):
-            shot_types = shots[i * 2 + j].keys()
-            attempts = np.array([shots[i * 2 + j][shot_type][0] for shot_type in shots[i * 2 + j]])
-            makes = np.array([shots[i * 2 + j][shot_type][1] for shot_type in shots[i * 2 + j]])
-            misses = attempts - makes
-            orbs = np.array([rebs[i * 2 + j][shot_type] for shot_type in rebs[i * 2 + j]])
-            orb_percentages = orbs / misses * 100
-            ax[i][j].bar(shot_types, orb_percentages, color=['b', 'b', 'b', 'b', 'm', 'm', 'm'])
-            ax[i][j].set_xticklabels(shot_types, rotation=30)
-            ax[i][j].set_xlabel('Shot Type')
-            ax[i][j].set_ylabel('Offensive Rebounding % Off Miss')
-            ax[i][j].set_title(str(2019 - i * 2 - j) + '-' + str(2019 - i * 2 - j + 1) + \
-                            ' League Wide \n Shot Type vs. Offensive Rebounding % Off Miss')
-            plt.tight_layout()
-    fig.savefig('orb_percentage_of_misses.png')
+    misses = shots[:, 0] - shots[:, 1]
+    orb_percentages = rebs / misses * 100
+    plot_seasons(orb_percentages, 'Offensive Rebounding % Off Miss', 'orb_percentage_of_misses.png')
 
 
 def gen_bar_exp_pts(exp_pts):
     """
-    Takes as param a list of different years' expected points
+    Takes as param a n_seasons x 7 np array of expected points
     (based on shot type) data.
 
     Saves a bar chart showing different shot types
     vs. the expected points generated from that shot WITHOUT
     factoring in offensive rebounding that occurs after the shot.
     """
-    fig, ax = plt.subplots(nrows=2, ncols=2, figsize=(10, 10))
-    for i in range(len(ax)):
-        for j in range(len(ax[0])):
-            shot_types = exp_pts[i * 2 + j].keys()
-            exp_pts_data = exp_pts[i * 2 + j].values()
-            ax[i][j].bar(shot_types, exp_pts_data, color=['b', 'b', 'b', 'b', 'm', 'm', 'm'])
-            ax[i][j].set_xticklabels(shot_types, rotation=30)
-            ax[i][j].set_xlabel('Shot Type')
-            ax[i][j].set_ylabel('Expected Points Generated')
-            ax[i][j].set_title(str(2019 - i * 2 - j) + '-' + str(2019 - i * 2 - j + 1) + \
-                            ' League Wide \n Shot Type vs. Expected Points Generated')
-            plt.tight_layout()
-    fig.savefig('exp_pts.png')
+    plot_seasons(exp_pts, 'Expected Points Generated', 'exp_pts.png')
 
 
 def gen_bar_exp_pts_w_orb(exp_pts_w_orb):
     """
-    Takes as param a list of different years' expected points
+    Takes as param a n_seasons x 7 np array of expected points
     (based on shot type) data.
     
     Saves a bar chart showing different shot types
     vs. the expected points generated from that shot AND the
     potential for offensive rebounding that occurs after the shot.
     """
-    fig, ax = plt.subplots(nrows=2, ncols=2, figsize=(10, 10))
-    for i in range(len(ax)):
-        for j in range(len(ax[0])):
-            shot_types = exp_pts_w_orb[i * 2 + j].keys()
-            exp_pts_data = exp_pts_w_orb[i * 2 + j].values()
-            ax[i][j].bar(shot_types, exp_pts_data, color=['b', 'b', 'b', 'b', 'm', 'm', 'm'])
-            ax[i][j].set_xticklabels(shot_types, rotation=30)
-            ax[i][j].set_xlabel('Shot Type')
-            ax[i][j].set_ylabel('Expected Points Generated')
-            ax[i][j].set_title(str(2019 - i * 2 - j) + '-' + str(2019 - i * 2 - j + 1) + \
-                            ' League Wide \n Shot Type vs. Expected Points Generated')
-            plt.tight_layout()
-    fig.savefig('exp_pts_w_orb.png')
+    plot_seasons(exp_pts_w_orb, 'Expected Points Generated', 'exp_pts_w_orb.png')
 
 
 def main():
-    data_19_20 = pd.read_csv('NBA-PBP-2019-2020.csv')
-    data_18_19 = pd.read_csv('NBA-PBP-2018-2019.csv')
-    data_17_18 = pd.read_csv('NBA-PBP-2017-2018.csv')
-    data_16_17 = pd.read_csv('NBA-PBP-2016-2017.csv')
-    data = [data_19_20, data_18_19, data_17_18, data_16_17]
-    ppp_data = [calc_ppp(year) for year in data]
+    with ProcessPoolExecutor(max_workers=min(len(SEASON_FILES), os.cpu_count() or 1)) as executor:
+        ppp_data, shot_data, rebs_data = zip(*executor.map(process_season, SEASON_FILES))
     print(ppp_data)
-    cleaned_data = [clean_data(year) for year in data]
-    shot_data = calc_shots(cleaned_data)
-    rebs_data = calc_rebs(cleaned_data)
+    shot_data = np.stack(shot_data)
+    rebs_data = np.stack(rebs_data)
     exp_pts_data = calc_exp_pts(shot_data)
     exp_pts_w_orb_data = calc_exp_pts_w_orb(shot_data, rebs_data, ppp_data)
     gen_bar_shots_attempts(shot_data)